@@ -1,22 +1,33 @@
-from dataclasses import dataclass
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 import logging
 import logging.handlers
+import math
+import random
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
+import aiohttp
+import httpx
+import lxml.html
+from lxml import etree
 import numpy as np
-import pandas as pd
+import orjson
 import requests
 import talib
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
+from requests.adapters import HTTPAdapter
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 def setup_logging(filename: str = 'trading.log') -> None:
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
@@ -34,6 +45,95 @@ def setup_logging(filename: str = 'trading.log') -> None:
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
 
+@njit(cache=True, fastmath=True)
+def _update_ema(prev: float, x: float, alpha: float) -> float:
+    return prev + alpha * (x - prev)
+
+@njit(cache=True, fastmath=True)
+def _update_rsi(avg_gain: float, avg_loss: float, delta: float, n: int) -> Tuple[float, float]:
+    gain = delta if delta > 0.0 else 0.0
+    loss = -delta if delta < 0.0 else 0.0
+    return (avg_gain * (n - 1) + gain) / n, (avg_loss * (n - 1) + loss) / n
+
+@njit(cache=True, fastmath=True)
+def _update_macd(ema_fast: float, ema_slow: float, signal: float, x: float,
+                 alpha_fast: float, alpha_slow: float, alpha_signal: float) -> Tuple[float, float, float]:
+    ema_fast += alpha_fast * (x - ema_fast)
+    ema_slow += alpha_slow * (x - ema_slow)
+    signal += alpha_signal * ((ema_fast - ema_slow) - signal)
+    return ema_fast, ema_slow, signal
+
+@njit(cache=True, fastmath=True)
+def _update_bb(sum_: float, sumsq: float, new: float, old: float) -> Tuple[float, float]:
+    return sum_ + new - old, sumsq + new * new - old * old
+
+@njit(cache=True, fastmath=True)
+def _update_atr(prev_atr: float, high: float, low: float, prev_close: float, n: int) -> float:
+    true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    return (prev_atr * (n - 1) + true_range) / n
+
+@njit(cache=True, fastmath=True)
+def _update_candle(ema9: float, ema21: float, ema50: float, rsi_avg_gain: float, rsi_avg_loss: float,
+                   macd_fast: float, macd_slow: float, macd_signal: float, bb_sum: float, bb_sumsq: float,
+                   atr: float, last_close: float, close: float, high: float, low: float, dropped: float,
+                   periods: Tuple[int, int, int, int, int, int, int, int]) -> Tuple[float, ...]:
+    """Advance every indicator by one candle in a single compiled call.
+
+    `periods` is (EMA short, EMA medium, EMA long, MACD fast, MACD slow,
+    MACD signal, RSI, ATR). The per-indicator kernels are inlined here,
+    so fastmath can contract the EMA recurrences into FMAs across them.
+    """
+    ema_short, ema_medium, ema_long, fast, slow, signal, rsi_n, atr_n = periods
+    ema9 = _update_ema(ema9, close, 2.0 / (ema_short + 1))
+    ema21 = _update_ema(ema21, close, 2.0 / (ema_medium + 1))
+    ema50 = _update_ema(ema50, close, 2.0 / (ema_long + 1))
+    rsi_avg_gain, rsi_avg_loss = _update_rsi(rsi_avg_gain, rsi_avg_loss, close - last_close, rsi_n)
+    macd_fast, macd_slow, macd_signal = _update_macd(
+        macd_fast, macd_slow, macd_signal, close, 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1)
+    )
+    bb_sum, bb_sumsq = _update_bb(bb_sum, bb_sumsq, close, dropped)
+    atr = _update_atr(atr, high, low, last_close, atr_n)
+    return (ema9, ema21, ema50, rsi_avg_gain, rsi_avg_loss,
+            macd_fast, macd_slow, macd_signal, bb_sum, bb_sumsq, atr)
+
+@njit(cache=True, fastmath=True)
+def _ema_sweep(close: np.ndarray, periods: np.ndarray, fast: int, slow: int,
+               signal_period: int) -> Tuple[np.ndarray, float]:
+    """Final EMA for every period after one pass over `close`, plus the final MACD signal.
+
+    Each EMA is seeded with the SMA of its first `period` values like talib,
+    and columns `fast`/`slow` form the MACD line the signal EMA runs over.
+    Only running values are kept, no per-candle history is allocated.
+    """
+    k = periods.shape[0]
+    emas = np.zeros(k)
+    signal = 0.0
+    signal_count = 0
+    signal_alpha = 2.0 / (signal_period + 1)
+    
+    for i in range(close.shape[0]):
+        x = close[i]
+        for j in range(k):
+            p = periods[j]
+            if i < p:
+                emas[j] += x
+                if i == p - 1:
+                    emas[j] /= p
+            else:
+                emas[j] += 2.0 / (p + 1) * (x - emas[j])
+        
+        if i >= periods[slow] - 1:
+            macd = emas[fast] - emas[slow]
+            if signal_count < signal_period:
+                signal += macd
+                signal_count += 1
+                if signal_count == signal_period:
+                    signal /= signal_period
+            else:
+                signal += signal_alpha * (macd - signal)
+    
+    return emas, signal
+
 @dataclass
 class MarketState:
     symbol: str
@@ -49,6 +149,66 @@ class MarketState:
     entry_triggered: bool = False
     is_active: bool = True
 
+@dataclass
+class Klines:
+    """OHLCV candles for one symbol as float64 column views"""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    symbol: str
+
+@dataclass
+class IndicatorState:
+    """Running indicator values for one symbol, up to its last closed candle"""
+    ema9: float
+    ema21: float
+    ema50: float
+    rsi_avg_gain: float
+    rsi_avg_loss: float
+    macd_fast: float
+    macd_slow: float
+    macd_signal: float
+    bb_sum: float
+    bb_sumsq: float
+    atr: float
+    last_close: float
+    last_ts: int
+
+    def update(self, analyzer: 'MarketAnalyzer', close: float, high: float, low: float, dropped: float) -> None:
+        """Advance every indicator by one candle; `dropped` is the close leaving the BB window"""
+        (self.ema9, self.ema21, self.ema50, self.rsi_avg_gain, self.rsi_avg_loss,
+         self.macd_fast, self.macd_slow, self.macd_signal, self.bb_sum, self.bb_sumsq,
+         self.atr) = _update_candle(
+            self.ema9, self.ema21, self.ema50, self.rsi_avg_gain, self.rsi_avg_loss,
+            self.macd_fast, self.macd_slow, self.macd_signal, self.bb_sum, self.bb_sumsq,
+            self.atr, self.last_close, close, high, low, dropped,
+            (analyzer.EMA_SHORT, analyzer.EMA_MEDIUM, analyzer.EMA_LONG, analyzer.MACD_FAST,
+             analyzer.MACD_SLOW, analyzer.MACD_SIGNAL, analyzer.RSI_PERIOD, analyzer.ATR_PERIOD)
+        )
+        self.last_close = close
+
+    def values(self, analyzer: 'MarketAnalyzer') -> Dict[str, float]:
+        """Indicator values as of the last applied candle"""
+        total = self.rsi_avg_gain + self.rsi_avg_loss
+        bb_middle = self.bb_sum / analyzer.BB_PERIOD
+        bb_std = math.sqrt(max(self.bb_sumsq / analyzer.BB_PERIOD - bb_middle * bb_middle, 0.0))
+        
+        return {
+            'EMA_short': self.ema9,
+            'EMA_medium': self.ema21,
+            'EMA_long': self.ema50,
+            'RSI': 100.0 * self.rsi_avg_gain / total if total else 0.0,
+            'MACD': self.macd_fast - self.macd_slow,
+            'MACD_signal': self.macd_signal,
+            'BB_upper': bb_middle + analyzer.BB_DEV * bb_std,
+            'BB_middle': bb_middle,
+            'BB_lower': bb_middle - analyzer.BB_DEV * bb_std,
+            'ATR': self.atr
+        }
+
 @dataclass
 class TradingSignal:
     symbol: str
@@ -68,7 +228,15 @@ class TelegramBot:
         self.token = token
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{token}"
-        self.session = requests.Session()
+        self._send_url = f"{self.base_url}/sendMessage"
+        self._payload_base = {"chat_id": self.chat_id, "parse_mode": "HTML"}
+        self._json_headers = {"Content-Type": "application/json"}
+        # One HTTP/2 connection, reused across messages and retries
+        self.client = httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
         
         # Verify bot credentials on initialization
         self.verify_bot()
@@ -76,9 +244,9 @@ class TelegramBot:
     def verify_bot(self) -> None:
         """Verify bot credentials and permissions"""
         try:
-            response = self.session.get(f"{self.base_url}/getMe", timeout=10)
+            response = self.client.get(f"{self.base_url}/getMe")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if not data.get('ok'):
                 raise ValueError(f"Bot verification failed: {data.get('description')}")
@@ -95,19 +263,16 @@ class TelegramBot:
 
     def send_message(self, text: str, retries: int = 3, parse_mode: str = "HTML") -> bool:
         """Send message with retry mechanism"""
+        payload = {**self._payload_base, "text": text}
+        if parse_mode != payload["parse_mode"]:
+            payload["parse_mode"] = parse_mode
+        body = orjson.dumps(payload)
+        
         for attempt in range(retries):
             try:
-                response = self.session.post(
-                    f"{self.base_url}/sendMessage",
-                    json={
-                        "chat_id": self.chat_id,
-                        "text": text,
-                        "parse_mode": parse_mode
-                    },
-                    timeout=10
-                )
+                response = self.client.post(self._send_url, content=body, headers=self._json_headers)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
                 
                 if not data.get('ok'):
                     raise ValueError(f"Message send failed: {data.get('description')}")
@@ -115,7 +280,7 @@ class TelegramBot:
                 logging.info(f"Message sent successfully (length: {len(text)})")
                 return True
                 
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPError as e:
                 logging.warning(f"Attempt {attempt + 1} failed: {str(e)}")
                 if attempt < retries - 1:
                     delay = 2 ** attempt
@@ -137,63 +302,120 @@ class MarketAnalyzer:
         self.EMA_SHORT = 9
         self.EMA_MEDIUM = 21
         self.EMA_LONG = 50
+        self.MACD_FAST = 12
+        self.MACD_SLOW = 26
+        self.MACD_SIGNAL = 9
+        self.BB_PERIOD = 20
+        self.BB_DEV = 2.0
+        self.ATR_PERIOD = 14
         self.VOLUME_THRESHOLD = 1.5
+        self._state: Dict[str, IndicatorState] = {}
+        self._state_locks: Dict[str, threading.Lock] = {}
 
-    def calculate_indicators(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
-        """Calculate technical indicators"""
-        try:
-            close = df['close'].astype(float).values
-            high = df['high'].astype(float).values
-            low = df['low'].astype(float).values
-            volume = df['volume'].astype(float).values
+    def calculate_indicators(self, klines: Klines) -> Dict[str, float]:
+        """Calculate technical indicators for the latest candle.
 
-            indicators = {}
-            
-            # EMAs
-            indicators['EMA_short'] = talib.EMA(close, timeperiod=self.EMA_SHORT)
-            indicators['EMA_medium'] = talib.EMA(close, timeperiod=self.EMA_MEDIUM)
-            indicators['EMA_long'] = talib.EMA(close, timeperiod=self.EMA_LONG)
-            
-            # RSI
-            indicators['RSI'] = talib.RSI(close, timeperiod=self.RSI_PERIOD)
-            
-            # MACD
-            macd, signal, _ = talib.MACD(close)
-            indicators['MACD'] = macd
-            indicators['MACD_signal'] = signal
-            
-            # Bollinger Bands
-            upper, middle, lower = talib.BBANDS(close)
-            indicators['BB_upper'] = upper
-            indicators['BB_middle'] = middle
-            indicators['BB_lower'] = lower
+        Closed candles are folded into a per-symbol IndicatorState, so a
+        warm call only applies the candles that arrived since the last poll.
+        The still-forming last candle is applied to a copy of the state.
+        """
+        try:
+            close = klines.close
+            high = klines.high
+            low = klines.low
+            timestamp = klines.timestamp
+            last = len(close) - 1
             
-            # ATR
-            indicators['ATR'] = talib.ATR(high, low, close)
+            min_candles = max(self.EMA_LONG, self.MACD_SLOW + self.MACD_SIGNAL,
+                              self.RSI_PERIOD, self.ATR_PERIOD, self.BB_PERIOD) + 1
+            if len(close) <= min_candles:
+                return {}
+
+            # setdefault is atomic, so concurrent callers always share one lock per symbol
+            with self._state_locks.setdefault(klines.symbol, threading.Lock()):
+                state = self._state.get(klines.symbol)
+                start = 0
+                if state is not None:
+                    start = int(np.searchsorted(timestamp, state.last_ts, side='right'))
+                    
+                if (state is None or not self.BB_PERIOD <= start <= last
+                        or timestamp[start - 1] != state.last_ts):
+                    state = self._bootstrap_state(klines)
+                else:
+                    for i in range(start, last):
+                        state.update(self, close[i], high[i], low[i], close[i - self.BB_PERIOD])
+                    state.last_ts = int(timestamp[last - 1])
+                self._state[klines.symbol] = state
+                current = replace(state)
 
-            return indicators
+            current.update(self, close[last], high[last], low[last], close[last - self.BB_PERIOD])
+            return current.values(self)
             
         except Exception as e:
             logging.error(f"Error calculating indicators: {str(e)}")
             return {}
 
-    def analyze_market(self, df: pd.DataFrame, indicators: Dict[str, np.ndarray]) -> Optional[TradingSignal]:
+    def _bootstrap_state(self, klines: Klines) -> IndicatorState:
+        """Build the indicator state from scratch over the closed candles"""
+        close = klines.close[:-1]
+        high = klines.high[:-1]
+        low = klines.low[:-1]
+        
+        periods = np.array([self.EMA_SHORT, self.EMA_MEDIUM, self.EMA_LONG,
+                            self.MACD_FAST, self.MACD_SLOW], dtype=np.int64)
+        emas, macd_signal = _ema_sweep(close, periods, 3, 4, self.MACD_SIGNAL)
+        ema9, ema21, ema50, macd_fast, macd_slow = emas.tolist()
+        
+        rsi_avg_gain, rsi_avg_loss = self._rsi_averages(close)
+        window = close[-self.BB_PERIOD:]
+        
+        return IndicatorState(
+            ema9=ema9,
+            ema21=ema21,
+            ema50=ema50,
+            rsi_avg_gain=rsi_avg_gain,
+            rsi_avg_loss=rsi_avg_loss,
+            macd_fast=macd_fast,
+            macd_slow=macd_slow,
+            macd_signal=float(macd_signal),
+            bb_sum=float(window.sum()),
+            bb_sumsq=float(np.dot(window, window)),
+            atr=float(talib.ATR(high, low, close, timeperiod=self.ATR_PERIOD)[-1]),
+            last_close=float(close[-1]),
+            last_ts=int(klines.timestamp[-2])
+        )
+
+    def _rsi_averages(self, close: np.ndarray) -> Tuple[float, float]:
+        """Wilder-smoothed average gain and loss, seeded like talib's RSI"""
+        n = self.RSI_PERIOD
+        delta = np.diff(close)
+        gains = np.maximum(delta, 0.0)
+        losses = np.maximum(-delta, 0.0)
+        
+        avg_gain = float(gains[:n].mean())
+        avg_loss = float(losses[:n].mean())
+        for gain, loss in zip(gains[n:].tolist(), losses[n:].tolist()):
+            avg_gain = (avg_gain * (n - 1) + gain) / n
+            avg_loss = (avg_loss * (n - 1) + loss) / n
+        return avg_gain, avg_loss
+
+    def analyze_market(self, klines: Klines, indicators: Dict[str, float], now: datetime) -> Optional[TradingSignal]:
         """Analyze market conditions and generate signals"""
         try:
             if not indicators:
                 return None
 
-            current_price = float(df['close'].iloc[-1])
-            symbol = df['symbol'].iloc[0]
+            current_price = float(klines.close[-1])
+            symbol = klines.symbol
 
             # Get current indicator values
-            rsi = indicators['RSI'][-1]
-            macd = indicators['MACD'][-1]
-            macd_signal = indicators['MACD_signal'][-1]
-            atr = indicators['ATR'][-1]
+            rsi = indicators['RSI']
+            macd = indicators['MACD']
+            macd_signal = indicators['MACD_signal']
+            atr = indicators['ATR']
 
             # Check for long signal
-            if (indicators['EMA_short'][-1] > indicators['EMA_medium'][-1] and
+            if (indicators['EMA_short'] > indicators['EMA_medium'] and
                 rsi < self.RSI_OVERBOUGHT and
                 macd > macd_signal):
 
@@ -205,17 +427,17 @@ class MarketAnalyzer:
                     take_profit=current_price + (3 * atr),
                     signal_type="LONG",
                     confidence=0.8,
-                    timestamp=datetime.now(),
+                    timestamp=now,
                     indicators={
                         'RSI': rsi,
                         'MACD': macd,
-                        'BB_upper': indicators['BB_upper'][-1],
-                        'BB_lower': indicators['BB_lower'][-1]
+                        'BB_upper': indicators['BB_upper'],
+                        'BB_lower': indicators['BB_lower']
                     }
                 )
 
             # Check for short signal
-            elif (indicators['EMA_short'][-1] < indicators['EMA_medium'][-1] and
+            elif (indicators['EMA_short'] < indicators['EMA_medium'] and
                   rsi > self.RSI_OVERSOLD and
                   macd < macd_signal):
 
@@ -227,12 +449,12 @@ class MarketAnalyzer:
                     take_profit=current_price - (3 * atr),
                     signal_type="SHORT",
                     confidence=0.8,
-                    timestamp=datetime.now(),
+                    timestamp=now,
                     indicators={
                         'RSI': rsi,
                         'MACD': macd,
-                        'BB_upper': indicators['BB_upper'][-1],
-                        'BB_lower': indicators['BB_lower'][-1]
+                        'BB_upper': indicators['BB_upper'],
+                        'BB_lower': indicators['BB_lower']
                     }
                 )
 
@@ -242,147 +464,259 @@ class MarketAnalyzer:
             logging.error(f"Error analyzing market: {str(e)}")
             return None
 
+_SIGNAL_TMPL = (
+    "{emoji} <b>Trading Signal - {symbol}</b>\n\n"
+    "📊 Type: {signal_type}\n"
+    "💰 Price: {price:.8f}\n"
+    "✅ Entry: {entry:.8f}\n"
+    "🛑 Stop Loss: {stop_loss:.8f}\n"
+    "🎯 Take Profit: {take_profit:.8f}\n"
+    "📈 Confidence: {confidence_stars} ({confidence:.2%})\n\n"
+    "📊 Indicators:\n"
+    "RSI: {rsi:.2f}\n"
+    "MACD: {macd:.8f}\n"
+    "BB Upper: {bb_upper:.8f}\n"
+    "BB Lower: {bb_lower:.8f}\n\n"
+    "⏰ {timestamp:%Y-%m-%d %H:%M:%S}"
+).format
+
 class TradingNotifier:
     def __init__(self, token: str, chat_id: str):
         self.bot = TelegramBot(token, chat_id)
-        self.last_notification = {}
+        # Oldest notification first, so expiry only touches expired entries
+        self.last_notification: OrderedDict[str, float] = OrderedDict()
+        # Per-symbol locks: signals are sent from worker threads
+        self._send_locks: Dict[str, threading.Lock] = {}
         self.MIN_NOTIFICATION_INTERVAL = 300  # 5 minutes
 
-    def send_signal(self, signal: TradingSignal) -> bool:
-        """Send trading signal with rate limiting"""
-        if self._can_send_notification(signal.symbol):
-            message = self._format_signal(signal)
-            success = self.bot.send_message(message)
-            if success:
-                self.last_notification[signal.symbol] = datetime.now()
-            return success
-        return False
+    def send_signal(self, signal: TradingSignal, now_mono: float) -> bool:
+        """Send trading signal with rate limiting; `now_mono` is a time.monotonic() reading"""
+        # Check, send and record as one step, so concurrent signals for the
+        # same symbol cannot both pass the rate limit
+        with self._send_locks.setdefault(signal.symbol, threading.Lock()):
+            if self._can_send_notification(signal.symbol, now_mono):
+                message = self._format_signal(signal)
+                success = self.bot.send_message(message)
+                if success:
+                    self.last_notification[signal.symbol] = now_mono
+                    self.last_notification.move_to_end(signal.symbol)
+                return success
+            return False
 
     def _format_signal(self, signal: TradingSignal) -> str:
         """Format trading signal message"""
-        emoji = "🚀" if signal.signal_type == "LONG" else "🔻"
-        confidence_stars = "⭐" * int(signal.confidence * 5)
-        
-        return (
-            f"{emoji} <b>Trading Signal - {signal.symbol}</b>\n\n"
-            f"📊 Type: {signal.signal_type}\n"
-            f"💰 Price: {signal.price:.8f}\n"
-            f"✅ Entry: {signal.entry:.8f}\n"
-            f"🛑 Stop Loss: {signal.stop_loss:.8f}\n"
-            f"🎯 Take Profit: {signal.take_profit:.8f}\n"
-            f"📈 Confidence: {confidence_stars} ({signal.confidence:.2%})\n\n"
-            f"📊 Indicators:\n"
-            f"RSI: {signal.indicators['RSI']:.2f}\n"
-            f"MACD: {signal.indicators['MACD']:.8f}\n"
-            f"BB Upper: {signal.indicators['BB_upper']:.8f}\n"
-            f"BB Lower: {signal.indicators['BB_lower']:.8f}\n\n"
-            f"⏰ {signal.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+        indicators = signal.indicators
+        return _SIGNAL_TMPL(
+            emoji="🚀" if signal.signal_type == "LONG" else "🔻",
+            symbol=signal.symbol,
+            signal_type=signal.signal_type,
+            price=signal.price,
+            entry=signal.entry,
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit,
+            confidence_stars="⭐" * int(signal.confidence * 5),
+            confidence=signal.confidence,
+            rsi=indicators['RSI'],
+            macd=indicators['MACD'],
+            bb_upper=indicators['BB_upper'],
+            bb_lower=indicators['BB_lower'],
+            timestamp=signal.timestamp
         )
 
-    def _can_send_notification(self, symbol: str) -> bool:
+    def _can_send_notification(self, symbol: str, now_mono: float) -> bool:
         """Check if enough time has passed since last notification"""
-        if symbol not in self.last_notification:
-            return True
-        time_since_last = (datetime.now() - self.last_notification[symbol]).total_seconds()
-        return time_since_last >= self.MIN_NOTIFICATION_INTERVAL
+        return now_mono - self.last_notification.get(symbol, -math.inf) >= self.MIN_NOTIFICATION_INTERVAL
 
-    def cleanup_old_notifications(self, max_age: int = 3600) -> None:
+    def cleanup_old_notifications(self, now_mono: float, max_age: int = 3600) -> None:
         """Clean up old notification history"""
-        cutoff = datetime.now()
-        self.last_notification = {
-            symbol: timestamp
-            for symbol, timestamp in self.last_notification.items()
-            if (cutoff - timestamp).total_seconds() < max_age
-        }
+        while self.last_notification:
+            symbol, timestamp = next(iter(self.last_notification.items()))
+            if now_mono - timestamp < max_age:
+                break
+            self.last_notification.popitem(last=False)
 
 class CryptoMonitor:
+    # Compiled once; data rows of the first table with class "table" (header
+    # skipped), and only the symbol and ping columns of each row
+    _ROWS_XPATH = etree.XPath(
+        "((//table[contains(concat(' ', normalize-space(@class), ' '), ' table ')])[1]//tr)[position()>1]"
+    )
+    _CELLS_XPATH = etree.XPath('./td[position()<=2]')
+    # Binance klines retry policy: statuses worth retrying, retry count, backoff base
+    _RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    _FETCH_RETRIES = 2
+    _BACKOFF_FACTOR = 0.3
+    
     def __init__(self, notifier: TradingNotifier):
         setup_logging()
         self.notifier = notifier
         self.analyzer = MarketAnalyzer()
         self.monitored_pairs = {}
+        self._pairs_lock = threading.Lock()
         self.last_update = {}
-        self.initialize_driver()
+        self.base_url = "https://agile-cliffs-23967.herokuapp.com/binance"
+        self.klines_url = "https://api.binance.com/api/v3/klines"
         
-    def initialize_driver(self):
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
+        # Keep-alive pool for the monitor page
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.driver.set_page_load_timeout(30)
-        self.wait = WebDriverWait(self.driver, 20)
+        # One event loop and aiohttp session for the monitor's lifetime, so
+        # TLS connections to Binance survive from one poll to the next
+        self._loop = asyncio.new_event_loop()
+        self._session: Optional[aiohttp.ClientSession] = None
 
-    def get_binance_data(self, symbol: str, interval: str = '5m', limit: int = 100) -> Optional[pd.DataFrame]:
+    def _parse_klines(self, rows: List[List[Any]], symbol: str) -> Optional[Klines]:
+        """Parse a raw klines payload into float64 OHLCV columns"""
         try:
-            url = "https://api.binance.com/api/v3/klines"
-            response = requests.get(url, params={
-                'symbol': symbol,
-                'interval': interval,
-                'limit': limit
-            }, timeout=10)
-            
-            response.raise_for_status()
-            data = response.json()
+            # Binance returns candles oldest first, so no sorting is needed.
+            # Filling column by column makes each OHLCV view C-contiguous,
+            # which talib and the numba kernels take without copying.
+            arr = np.fromiter(
+                (float(row[col]) for col in range(1, 6) for row in rows),
+                dtype=np.float64,
+                count=len(rows) * 5
+            ).reshape(5, -1)
             
-            df = pd.DataFrame(data, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignored'
-            ])
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            df['symbol'] = symbol
-            return df.sort_values('timestamp')
+            return Klines(
+                timestamp=np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+                open=arr[0],
+                high=arr[1],
+                low=arr[2],
+                close=arr[3],
+                volume=arr[4],
+                symbol=symbol
+            )
             
         except Exception as e:
-            logging.error(f"Error fetching data for {symbol}: {str(e)}")
+            logging.error(f"Error parsing data for {symbol}: {str(e)}")
             return None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the long-lived Binance session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            # Idle connections are kept longer than the 60s poll interval
+            connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=90, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+
+    async def _fetch_klines(self, session: aiohttp.ClientSession, symbol: str,
+                            interval: str = '5m', limit: int = 100) -> Optional[List[List[Any]]]:
+        """Fetch raw klines for one symbol, retrying throttling, 5xx and dropped connections"""
+        params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+        for attempt in range(self._FETCH_RETRIES + 1):
+            delay = self._BACKOFF_FACTOR * 2 ** attempt
+            try:
+                async with session.get(self.klines_url, params=params) as response:
+                    if response.status in self._RETRY_STATUSES and attempt < self._FETCH_RETRIES:
+                        retry_after = response.headers.get('Retry-After', '')
+                        if retry_after.isdecimal():
+                            delay = max(delay, int(retry_after))
+                        logging.warning(f"Binance returned {response.status} for {symbol}, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    response.raise_for_status()
+                    return await response.json(loads=orjson.loads)
+                    
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # A pooled connection the server already closed shows up here
+                if attempt < self._FETCH_RETRIES:
+                    await asyncio.sleep(delay)
+                    continue
+                logging.error(f"Error fetching data for {symbol}: {str(e)}")
+                return None
+                
+            except Exception as e:
+                logging.error(f"Error fetching data for {symbol}: {str(e)}")
+                return None
+
+    async def _fetch_all(self, symbols: List[str]) -> List[Optional[List[List[Any]]]]:
+        """Fetch klines for all symbols concurrently over the shared session"""
+        session = await self._get_session()
+        return await asyncio.gather(*[self._fetch_klines(session, symbol) for symbol in symbols])
+
+    def close(self) -> None:
+        """Close the Binance session, its event loop and the page session"""
+        if self._session is not None and not self._session.closed:
+            self._loop.run_until_complete(self._session.close())
+        self._loop.close()
+        self.http.close()
         
-    def process_market_data(self, symbol: str) -> None:
-        df = self.get_binance_data(symbol)
-        if df is None:
-            return
+    def process_market_data(self, symbol: str, klines: Klines,
+                            now: Optional[datetime] = None, now_mono: Optional[float] = None) -> None:
+        if now is None:
+            now = datetime.now()
+        if now_mono is None:
+            now_mono = time.monotonic()
             
-        indicators = self.analyzer.calculate_indicators(df)
-        signal = self.analyzer.analyze_market(df, indicators)
+        indicators = self.analyzer.calculate_indicators(klines)
+        signal = self.analyzer.analyze_market(klines, indicators, now)
         
         if signal and signal.confidence > 0.6:
-            self.notifier.send_signal(signal)
+            self.notifier.send_signal(signal, now_mono)
             
-            if symbol not in self.monitored_pairs:
-                self.monitored_pairs[symbol] = MarketState(
-                    symbol=symbol,
-                    start_time=datetime.now(),
-                    current_price=signal.price,
-                    entry_points=[signal.entry],
-                    stop_loss=signal.stop_loss,
-                    take_profit=signal.take_profit,
-                    signal_type=signal.signal_type
-                )
+            with self._pairs_lock:
+                if symbol not in self.monitored_pairs:
+                    self.monitored_pairs[symbol] = MarketState(
+                        symbol=symbol,
+                        start_time=now,
+                        current_price=signal.price,
+                        entry_points=[signal.entry],
+                        stop_loss=signal.stop_loss,
+                        take_profit=signal.take_profit,
+                        signal_type=signal.signal_type
+                    )
 
     def check_market_updates(self) -> None:
         """Check for market updates in the webpage"""
+        # One clock reading per poll keeps every timestamp in this cycle consistent
+        now = datetime.now()
+        now_mono = time.monotonic()
         try:
-            table = self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "table")))
-            rows = table.find_elements(By.TAG_NAME, "tr")[1:]  # Skip header
+            response = self.http.get(self.base_url, timeout=10)
+            response.raise_for_status()
             
+            root = lxml.html.fromstring(response.content)
+            rows = self._ROWS_XPATH(root)
+            
+            symbols = []
             for row in rows:
-                cols = row.find_elements(By.TAG_NAME, "td")
+                cols = [c.text_content().strip() for c in self._CELLS_XPATH(row)]
                 if len(cols) >= 2:
-                    symbol = f"{cols[0].text}USDT"
-                    pings = int(cols[1].text)
+                    symbol = f"{cols[0]}USDT"
+                    pings = int(cols[1])
                     
                     if pings >= 4:
-                        self.process_market_data(symbol)
+                        symbols.append(symbol)
+            
+            # A coin listed in several rows is fetched and analyzed once
+            symbols = list(dict.fromkeys(symbols))
+            if symbols:
+                results = self._loop.run_until_complete(self._fetch_all(symbols))
+                batch = []
+                for symbol, data in zip(symbols, results):
+                    if data is None:
+                        continue
+                    klines = self._parse_klines(data, symbol)
+                    if klines is not None:
+                        batch.append(klines)
+                
+                # Sending a signal blocks on Telegram, so symbols are processed concurrently;
+                # the indicator kernels hold the GIL but only take microseconds per symbol
+                if batch:
+                    with ThreadPoolExecutor(max_workers=min(8, len(batch))) as executor:
+                        list(executor.map(
+                            lambda klines: self.process_market_data(klines.symbol, klines, now, now_mono),
+                            batch
+                        ))
             
             # Clean up old notifications
-            self.notifier.cleanup_old_notifications()
+            self.notifier.cleanup_old_notifications(now_mono)
                     
         except Exception as e:
             logging.error(f"Error checking market updates: {str(e)}")
@@ -391,13 +725,21 @@ class CryptoMonitor:
     def run(self) -> None:
         """Main execution loop"""
         try:
-            self.driver.get("https://agile-cliffs-23967.herokuapp.com/binance")
             self.notifier.bot.send_message("🤖 Trading Bot Started")
             
+            next_tick = time.monotonic()
             while True:
                 try:
                     self.check_market_updates()
-                    time.sleep(60)  # Wait 60 seconds between checks
+                    
+                    # Keep a fixed 60s cadence regardless of how long the poll took;
+                    # the jitter stops every cycle hitting Binance at the same instant
+                    next_tick += 60
+                    delay = next_tick - time.monotonic()
+                    if delay < 0:
+                        next_tick = time.monotonic()
+                        delay = 0.0
+                    time.sleep(max(0.0, delay + random.uniform(-1, 1)))
                     
                 except Exception as e:
                     logging.error(f"Error in main loop: {str(e)}")
@@ -409,16 +751,8 @@ class CryptoMonitor:
             logging.error(f"Fatal error in run method: {str(e)}")
             raise
         finally:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
+            self.close()
 
-    def __del__(self):
-        """Cleanup method"""
-        try:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
-        except Exception as e:
-            logging.error(f"Error during cleanup: {str(e)}")
 # Main execution
 if __name__ == "__main__":
     try:
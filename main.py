@@ -2,19 +2,66 @@ import logging
 from datetime import datetime
 import time
 import os
+import queue
+from collections import OrderedDict
 import requests
+import httpx
+import orjson
+import lxml.html
+from lxml import etree
+import numpy as np
+from requests.adapters import HTTPAdapter
 from flask import Flask
 from threading import Thread
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException
 
 app = Flask(__name__)
 
+# Modelo da mensagem de cada moeda, montado uma única vez
+_MSG_TMPL = (
+    "🪙 <b>{coin}</b>\n"
+    "📊 Pings: {pings}\n"
+    "💰 Vol BTC: {net_vol_btc}\n"
+    "📈 Vol %: {net_vol_percent}%\n"
+    "📊 Vol Total: {recent_total_vol_btc} BTC\n"
+    "📊 Vol Recente %: {recent_vol_percent}%\n"
+    "💹 Vol Net: {recent_net_vol}\n"
+    "⏰ {timestamp}"
+)
+
+def _to_float(value):
+    """Converte textos como '1.5' ou '2.5%' em float; retorna None se for inválido"""
+    try:
+        return float(value.strip().rstrip('%'))
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """Limitador de taxa simples: `rate` tokens por segundo, até `capacity` acumulados"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        
+    def acquire(self):
+        """Bloqueia até haver um token disponível e o consome"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
 class CryptoMonitor:
+    # Consultas XPath compiladas uma única vez: linhas de dados da primeira
+    # tabela com a classe "table" (sem o cabeçalho) e suas células
+    _ROWS_XPATH = etree.XPath(
+        "((//table[contains(concat(' ', normalize-space(@class), ' '), ' table ')])[1]//tr)[position()>1]"
+    )
+    _CELLS_XPATH = etree.XPath('./td')
+    
     def __init__(self):
         # Configuração do logger
         logging.basicConfig(
@@ -27,108 +74,212 @@ class CryptoMonitor:
         self.telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID')
         self.telegram_base_url = f"https://api.telegram.org/bot{self.telegram_token}"
         
+        # Envio assíncrono: check_updates só enfileira, uma thread envia
+        # reaproveitando a conexão HTTP/2 e respeitando o limite de mensagens/s
+        self.tg_queue = queue.Queue()
+        self.tg_client = httpx.Client(http2=True, timeout=10.0, base_url=self.telegram_base_url)
+        # Limites do Telegram: 30 mensagens/s no total e 1 mensagem/s por chat
+        self.tg_bucket = TokenBucket(rate=30, capacity=30)
+        self.tg_chat_buckets = {}
+        # Parte fixa do corpo das mensagens, montada uma única vez
+        self._static_payload = {"chat_id": self.telegram_chat_id, "parse_mode": "HTML"}
+        self._json_headers = {"Content-Type": "application/json"}
+        self.tg_thread = Thread(target=self.telegram_worker, daemon=True)
+        self.tg_thread.start()
+        
         # Configurações do monitor
         self.base_url = "https://agile-cliffs-23967.herokuapp.com/binance"
-        self.driver = None
-        self.last_processed = set()
-            
-    def initialize_driver(self):
-        """Inicializa o Chrome WebDriver com configurações para servidor"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.set_page_load_timeout(30)
-            self.wait = WebDriverWait(self.driver, 20)
-            
-            logging.info("WebDriver inicializado com sucesso")
-            return True
-            
-        except Exception as e:
-            logging.error(f"Erro ao inicializar WebDriver: {str(e)}")
-            if self.driver:
-                self.driver.quit()
-            return False
+        # Entradas já enviadas, da mais antiga para a mais recente, com tamanho limitado
+        self.last_processed = OrderedDict()
+        self.max_processed = 10_000
+        # Validadores da última resposta, para GET condicional (304 sem corpo)
+        self._etag = None
+        self._lastmod = None
+        
+        # Sessão HTTP reaproveitada entre as verificações (keep-alive)
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
             
     def send_telegram_message(self, text):
         """Envia mensagem para o Telegram com retry"""
         max_retries = 3
-        for attempt in range(max_retries):
+        max_rate_limited = 5
+        # Corpo JSON serializado uma vez e reaproveitado nas tentativas
+        body = orjson.dumps({**self._static_payload, "text": text})
+        attempt = 0
+        rate_limited = 0
+        while True:
             try:
-                url = f"{self.telegram_base_url}/sendMessage"
-                data = {
-                    "chat_id": self.telegram_chat_id,
-                    "text": text,
-                    "parse_mode": "HTML"
-                }
-                
-                response = requests.post(url, data=data, timeout=10)
+                response = self.tg_client.post('/sendMessage', content=body, headers=self._json_headers)
+                if response.status_code == 429:
+                    # Limite do Telegram: espera o tempo pedido e reenvia a mesma
+                    # mensagem, mantendo a ordem da fila; desiste após algumas
+                    # tentativas para não travar a fila inteira
+                    rate_limited += 1
+                    if rate_limited > max_rate_limited:
+                        logging.error("Limite do Telegram persistente, mensagem descartada")
+                        return False
+                    retry_after = self.get_retry_after(response)
+                    logging.warning(f"Limite do Telegram atingido, aguardando {retry_after}s")
+                    time.sleep(retry_after)
+                    continue
                 response.raise_for_status()
                 logging.info("Mensagem enviada com sucesso")
                 return True
             except Exception as e:
-                if attempt == max_retries - 1:
+                attempt += 1
+                if attempt == max_retries:
                     logging.error(f"Erro ao enviar mensagem Telegram: {e}")
                     return False
-                time.sleep(2 ** attempt)
+                time.sleep(2 ** (attempt - 1))
+    
+    def get_retry_after(self, response):
+        """Segundos de espera pedidos num 429: corpo JSON, cabeçalho Retry-After ou 1 (no mínimo 1)"""
+        try:
+            return max(1, int(response.json()['parameters']['retry_after']))
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return max(1, int(response.headers.get('Retry-After', 1)))
+        except ValueError:
+            # Retry-After também pode vir como data HTTP
+            return 1
+            
+    def telegram_worker(self):
+        """Consome a fila de mensagens do Telegram"""
+        while True:
+            text = self.tg_queue.get()
+            try:
+                chat_bucket = self.tg_chat_buckets.get(self.telegram_chat_id)
+                if chat_bucket is None:
+                    chat_bucket = TokenBucket(rate=1, capacity=1)
+                    self.tg_chat_buckets[self.telegram_chat_id] = chat_bucket
+                # Primeiro o limite do chat, para não gastar o token global esperando
+                chat_bucket.acquire()
+                self.tg_bucket.acquire()
+                self.send_telegram_message(text)
+            except Exception as e:
+                logging.error(f"Erro no envio de mensagens: {e}")
+            finally:
+                self.tg_queue.task_done()
             
     def format_coin_message(self, coin_data):
         """Formata a mensagem com os dados da moeda"""
-        return (
-            f"🪙 <b>{coin_data['coin']}</b>\n"
-            f"📊 Pings: {coin_data['pings']}\n"
-            f"💰 Vol BTC: {coin_data['net_vol_btc']}\n"
-            f"📈 Vol %: {coin_data['net_vol_percent']}%\n"
-            f"📊 Vol Total: {coin_data['recent_total_vol_btc']} BTC\n"
-            f"📊 Vol Recente %: {coin_data['recent_vol_percent']}%\n"
-            f"💹 Vol Net: {coin_data['recent_net_vol']}\n"
-            f"⏰ {coin_data['timestamp']}"
-        )
+        return _MSG_TMPL.format_map(coin_data)
+    
+    def pack_messages(self, messages, limit=4000):
+        """Junta as mensagens em blocos de até `limit` caracteres (o Telegram aceita 4096)"""
+        chunks = []
+        current = []
+        size = 0
+        for message in messages:
+            extra = len(message) + (2 if current else 0)
+            if current and size + extra > limit:
+                chunks.append("\n\n".join(current))
+                current = []
+                size = 0
+                extra = len(message)
+            current.append(message)
+            size += extra
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+    
+    def parse_numeric_columns(self, table):
+        """Converte as colunas numéricas (2 a 6) de todas as linhas de uma vez"""
+        # Remove o '%' de todas as células numa única operação vetorizada
+        cells = np.char.strip(np.array([cols[2:7] for cols in table], dtype=str).reshape(-1, 5), '%')
+        try:
+            return cells.astype(np.float64).tolist()
+        except ValueError as e:
+            # Alguma célula inválida: converte linha a linha e descarta só as ruins
+            logging.error(f"Erro ao converter valores da tabela: {e}")
+            values = []
+            for row in cells.tolist():
+                numbers = [_to_float(c) for c in row]
+                values.append(None if None in numbers else numbers)
+            return values
     
     def check_updates(self):
         """Verifica todas as atualizações na página"""
         try:
-            table = self.driver.find_element(By.CLASS_NAME, "table")
-            rows = table.find_elements(By.TAG_NAME, "tr")[1:]
+            headers = {}
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._lastmod:
+                headers['If-Modified-Since'] = self._lastmod
+            
+            response = self.http.get(self.base_url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                logging.info("Página sem alterações")
+                return True
+            response.raise_for_status()
+            
+            root = lxml.html.fromstring(response.content)
+            rows = self._ROWS_XPATH(root)
             
-            current_entries = set()
+            entry_count = 0
+            new_rows = []
+            seen = set()
             
             for row in rows:
-                try:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    if len(cols) < 8:
-                        continue
-                        
-                    coin_data = {
-                        'coin': cols[0].text,
-                        'pings': int(cols[1].text),
-                        'net_vol_btc': float(cols[2].text),
-                        'net_vol_percent': float(cols[3].text.strip('%')),
-                        'recent_total_vol_btc': float(cols[4].text),
-                        'recent_vol_percent': float(cols[5].text.strip('%')),
-                        'recent_net_vol': float(cols[6].text),
-                        'timestamp': cols[7].text
-                    }
-                    
-                    entry_key = f"{coin_data['coin']}_{coin_data['timestamp']}"
-                    current_entries.add(entry_key)
-                    
-                    if entry_key not in self.last_processed:
-                        message = self.format_coin_message(coin_data)
-                        self.send_telegram_message(message)
-                        logging.info(f"Nova atualização: {coin_data['coin']}")
-                        
-                except Exception as e:
-                    logging.error(f"Erro ao processar linha: {e}")
+                cells = self._CELLS_XPATH(row)
+                if len(cells) < 8:
+                    continue
+                
+                # Só a moeda e o horário identificam a entrada; o resto da
+                # linha só é lido e convertido se ela ainda não foi enviada
+                entry_key = (cells[0].text_content().strip(), cells[7].text_content().strip())
+                entry_count += 1
+                if entry_key in self.last_processed:
+                    self.last_processed.move_to_end(entry_key)
                     continue
+                # Linha repetida na mesma página
+                if entry_key in seen:
+                    continue
+                seen.add(entry_key)
+                new_rows.append([c.text_content().strip() for c in cells])
             
-            self.last_processed = current_entries
-            logging.info(f"Verificação concluída. {len(current_entries)} entradas processadas")
+            new_messages = []
+            new_keys = {}
+            for cols, numbers in zip(new_rows, self.parse_numeric_columns(new_rows)):
+                # Linhas inválidas são puladas sem levantar exceções e sem registrar
+                # a chave, para serem tentadas de novo na próxima verificação
+                if numbers is None or not cols[1].isdecimal():
+                    logging.warning(f"Linha com valores inválidos, nova tentativa na próxima verificação: {cols[0]}")
+                    continue
+                    
+                coin_data = {
+                    'coin': cols[0],
+                    'pings': int(cols[1]),
+                    'net_vol_btc': numbers[0],
+                    'net_vol_percent': numbers[1],
+                    'recent_total_vol_btc': numbers[2],
+                    'recent_vol_percent': numbers[3],
+                    'recent_net_vol': numbers[4],
+                    'timestamp': cols[7]
+                }
+                
+                new_messages.append(self.format_coin_message(coin_data))
+                # Só entradas que viraram mensagem contam como processadas
+                new_keys[(cols[0], cols[7])] = None
+                logging.info(f"Nova atualização: {coin_data['coin']}")
+            
+            # Uma mensagem por bloco em vez de uma por moeda
+            for message in self.pack_messages(new_messages):
+                self.tg_queue.put(message)
+            
+            # Só registra as entradas e os validadores depois de processar a
+            # página; se algo falhar antes, a próxima verificação a refaz inteira
+            self.last_processed.update(new_keys)
+            while len(self.last_processed) > self.max_processed:
+                self.last_processed.popitem(last=False)
+            self._etag = response.headers.get('ETag')
+            self._lastmod = response.headers.get('Last-Modified')
+            
+            logging.info(f"Verificação concluída. {entry_count} entradas processadas")
                     
         except Exception as e:
             logging.error(f"Erro ao verificar atualizações: {e}")
@@ -141,36 +292,27 @@ class CryptoMonitor:
         retry_count = 0
         max_retries = 5
         
+        logging.info("Iniciando monitoramento...")
+        
         while retry_count < max_retries:
             try:
-                if not self.initialize_driver():
-                    retry_count += 1
-                    time.sleep(60)
-                    continue
-                    
-                logging.info("Iniciando monitoramento...")
-                self.driver.get(self.base_url)
-                
-                self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "table")))
-                retry_count = 0
-                
+                # Cadência fixa de 10s, descontando o tempo gasto na verificação
+                next_tick = time.monotonic()
                 while True:
-                    try:
-                        self.check_updates()
-                        time.sleep(10)
-                        
-                    except WebDriverException:
-                        logging.error("Erro no WebDriver, tentando reconectar...")
-                        raise
+                    if self.check_updates():
+                        retry_count = 0
+                    next_tick += 10.0
+                    delay = next_tick - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        # Atrasado: não tenta compensar com verificações seguidas
+                        next_tick = time.monotonic()
                         
             except Exception as e:
                 logging.error(f"Erro no loop principal: {e}")
                 retry_count += 1
                 
-                if self.driver:
-                    self.driver.quit()
-                    self.driver = None
-                
                 if retry_count < max_retries:
                     sleep_time = min(300, 60 * retry_count)
                     logging.info(f"Tentando reconexão em {sleep_time} segundos...")